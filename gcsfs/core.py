@@ -1,32 +1,49 @@
 """
 Google Cloud Storage pythonic interface
 """
+
 import asyncio
+import functools
 import io
-import json
 import logging
 import os
 import posixpath
-import re
+import sys
+import time
 import warnings
 import weakref
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from urllib.parse import parse_qs
-from urllib.parse import quote as quote_urllib
-from urllib.parse import urlsplit
 
+import aiohttp
 import fsspec
 from fsspec import asyn
 from fsspec.callbacks import NoOpCallback
+from fsspec.dircache import DirCache
 from fsspec.implementations.http import get_client
 from fsspec.utils import setup_logging, stringify_path
 
 from . import __version__ as version
-from .checkers import get_consistency_checker
+from .checkers import Crc32cChecker, MD5Checker, get_consistency_checker
 from .credentials import GoogleCredentials
 from .inventory_report import InventoryReport
 from .retry import errs, retry_request, validate_response
 
+try:
+    from orjson import dumps as _json_dumpb
+    from orjson import loads as json_loads
+
+    def json_dumps(obj):
+        return _json_dumpb(obj).decode()
+
+except ImportError:
+    from json import dumps as json_dumps
+    from json import loads as json_loads
+
+    def _json_dumpb(obj):
+        return json_dumps(obj).encode()
+
+
 logger = logging.getLogger("gcsfs")
 
 
@@ -55,6 +72,18 @@ DEFAULT_PROJECT = os.getenv("GCSFS_DEFAULT_PROJECT", "")
 GCS_MIN_BLOCK_SIZE = 2**18
 GCS_MAX_BLOCK_SIZE = 2**28
 DEFAULT_BLOCK_SIZE = 5 * 2**20
+# Small ranged reads are widened to at least this many bytes and the surplus kept
+# on the file, so that nearby reads do not each cost a request
+MIN_READ_AHEAD_SIZE = 2**18
+# Reads are latency-bound, so they default to larger blocks than writes
+DEFAULT_READ_BLOCK_SIZE = int(float(os.getenv("GCSFS_READ_BLOCK_SIZE_MB", 16)) * 2**20)
+# Uploads at least this big are hashed in a thread while being sent
+THREADED_HASH_MIN_SIZE = 2**20
+# Most open files whose details are kept when details_cache_timeout is set
+DETAILS_CACHE_SIZE = 1024
+
+# Object resource fields whose values repeat across entries of a listing
+_INTERNED_FIELDS = ("bucket", "kind", "storageClass", "contentType")
 
 SUPPORTED_FIXED_KEY_METADATA = {
     "content_encoding": "contentEncoding",
@@ -63,6 +92,34 @@ SUPPORTED_FIXED_KEY_METADATA = {
     "content_language": "contentLanguage",
     "custom_time": "customTime",
 }
+# (source, destination) key pairs for ``_convert_fixed_key_metadata``
+_FIXED_KEY_METADATA_TO_GOOGLE = tuple(SUPPORTED_FIXED_KEY_METADATA.items())
+_FIXED_KEY_METADATA_FROM_GOOGLE = tuple(
+    (v, k) for k, v in SUPPORTED_FIXED_KEY_METADATA.items()
+)
+
+
+# Pieces of the multipart body of batch requests, see ``_rm_files``
+_BATCH_BOUNDARY = "===============7330845974216740156=="
+_BATCH_CONTENT_TYPE = f'multipart/mixed; boundary="{_BATCH_BOUNDARY}"'
+_BATCH_PART_HEAD = (
+    f"\n--{_BATCH_BOUNDARY}\n"
+    "Content-Type: application/http\n"
+    "Content-Transfer-Encoding: binary\n"
+    "Content-ID: <b29c5de2-0db4-490b-b421-6a51b598bd11+"
+)
+_BATCH_PART_TAIL = (
+    "Content-Type: application/json\naccept: application/json\ncontent-length: 0\n"
+)
+
+# Pieces of the multipart body of simple uploads, see ``simple_upload``
+_UPLOAD_PART_METADATA = b"--==0==\nContent-Type: application/json; charset=UTF-8\n\n"
+_UPLOAD_PART_DATA = b"\n--==0==\nContent-Type: "
+_UPLOAD_END = b"\n--==0==--"
+
+# Unreserved characters (RFC 3986), never percent-encoded by ``quote``
+_QUOTE_SAFE = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~"
+_QUOTE_TABLE = tuple(chr(b) if b in _QUOTE_SAFE else f"%{b:02X}" for b in range(256))
 
 
 def quote(s):
@@ -70,6 +127,10 @@ def quote(s):
     Quote characters to be safe for URL paths.
     Also quotes '/'.
 
+    Equivalent to ``urllib.parse.quote(s, safe="")``, but replacing each
+    distinct ASCII character to escape at once rather than going byte by byte,
+    with a precomputed byte table for non-ASCII input.
+
     Parameters
     ----------
     s: input URL/portion
@@ -79,7 +140,29 @@ def quote(s):
     corrected URL
     """
     # Encode everything, including slashes
-    return quote_urllib(s, safe="")
+    if isinstance(s, str):
+        bs = s.encode()
+    elif isinstance(s, (bytes, bytearray)):
+        bs = bytes(s)
+    else:
+        raise TypeError(f"quote() expected str or bytes, not {type(s).__name__}")
+    if not bs.rstrip(_QUOTE_SAFE):
+        return bs.decode()
+    unsafe = set(bs.translate(None, _QUOTE_SAFE))
+    if max(unsafe) >= 0x80:
+        return "".join(map(_QUOTE_TABLE.__getitem__, bs))
+    s = bs.decode()
+    # "%" first, so that the escapes of the others are left alone
+    if 0x25 in unsafe:
+        unsafe.remove(0x25)
+        s = s.replace("%", "%25")
+    for b in unsafe:
+        s = s.replace(chr(b), _QUOTE_TABLE[b])
+    return s
+
+
+# bucket names repeat across nearly every call, so their quoted form is memoised
+_quote_bucket = functools.lru_cache(maxsize=256)(quote)
 
 
 def norm_path(path):
@@ -105,6 +188,73 @@ class UnclosableBytesIO(io.BytesIO):
         self.seek(0)
 
 
+class IndexedDirCache(DirCache):
+    """DirCache which also keeps an index by name of each listing
+
+    The index is built on first use and dropped together with its listing,
+    whether that is replaced, removed, expired or evicted. Given
+    ``max_paths``, the least recently used listings beyond it are dropped
+    right away; fsspec's ``DirCache`` only treats such listings as invalid
+    once they are looked up again, so they stay in memory until then.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache = OrderedDict()
+        self._indices = {}
+
+    def __getitem__(self, item):
+        if self.listings_expiry_time is not None:
+            if self._times.get(item, 0) - time.time() < -self.listings_expiry_time:
+                self._cache.pop(item, None)
+                self._indices.pop(item, None)
+                self._times.pop(item, None)
+        if self.max_paths:
+            self._cache.move_to_end(item)  # maybe raises KeyError
+        return self._cache[item]  # maybe raises KeyError
+
+    def __setitem__(self, key, value):
+        if not self.use_listings_cache:
+            return
+        self._cache[key] = value
+        self._indices.pop(key, None)
+        if self.listings_expiry_time is not None:
+            self._times[key] = time.time()
+        if self.max_paths:
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_paths:
+                old = self._cache.popitem(last=False)[0]
+                self._indices.pop(old, None)
+                self._times.pop(old, None)
+
+    def __delitem__(self, key):
+        del self._cache[key]
+        self._indices.pop(key, None)
+        self._times.pop(key, None)
+
+    def clear(self):
+        self._cache.clear()
+        self._indices.clear()
+        self._times.clear()
+
+    def index(self, path):
+        """Map of name to entries of the cached listing of ``path``"""
+        listing = self[path]
+        index = self._indices.get(path)
+        if index is None:
+            index = {}
+            for entry in listing:
+                index.setdefault(entry["name"], []).append(entry)
+            self._indices[path] = index
+        return index
+
+    def __reduce__(self):
+        return (
+            IndexedDirCache,
+            (self.use_listings_cache, self.listings_expiry_time, self.max_paths),
+        )
+
+
 def _location():
     """
     Resolves GCS HTTP location as http[s]://host
@@ -135,20 +285,64 @@ def _chunks(lst, n):
         yield lst[i : i + n]
 
 
+@functools.lru_cache()
+def _protocol_prefixes(protocol):
+    """Path prefixes stripped for the given protocol(s), with their lengths."""
+    protos = (protocol,) if isinstance(protocol, str) else protocol
+    return tuple((p + sep, len(p) + len(sep)) for p in protos for sep in ("://", "::"))
+
+
+def _shard_offsets(prefix, n):
+    """Split points dividing names under ``prefix`` into ``n`` ranges
+
+    The ranges are spread evenly over printable ASCII for the first character
+    after the prefix; names outside it fall into the first or last range. So
+    there are at most 95 ranges, one per character, whatever ``n`` is.
+    """
+    n = min(n, 0x7F - 0x20)
+    step = (0x7F - 0x20) / n
+    return [prefix + chr(0x20 + round(i * step)) for i in range(1, n)]
+
+
+def _batch_response_code(response):
+    """HTTP status code of one part of a batch response, if any"""
+    i = response.find(b"HTTP/")
+    if i < 0:
+        return None
+    i = response.find(b" ", i) + 1
+    code = response[i : i + 3]
+    return int(code) if i and code.isdigit() else None
+
+
+def _batch_response_error(response):
+    """JSON error object of one part of a batch response, if any
+
+    That is the outermost object nested inside the part's body.
+    """
+    response = response.replace(b"\n", b"")
+    start, end = response.find(b"{") + 1, response.rfind(b"}")
+    if not start or end < start:
+        return None
+    start, end = response.find(b"{", start, end), response.rfind(b"}", start, end)
+    if start < 0 or end < start:
+        return None
+    return response[start : end + 1].decode()
+
+
 def _coalesce_generation(*args):
     """Helper to coalesce a list of object generations down to one."""
-    generations = set(args)
-    if None in generations:
-        generations.remove(None)
-    if len(generations) > 1:
-        raise ValueError(
-            "Cannot coalesce generations where more than one are defined,"
-            " {}".format(generations)
-        )
-    elif len(generations) == 0:
-        return None
-    else:
-        return generations.pop()
+    generation = None
+    for arg in args:
+        if arg is None:
+            continue
+        if generation is None:
+            generation = arg
+        elif arg != generation:
+            raise ValueError(
+                "Cannot coalesce generations where more than one are defined,"
+                " {}".format(set(args) - {None})
+            )
+    return generation
 
 
 class GCSFileSystem(asyn.AsyncFileSystem):
@@ -210,10 +404,13 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     GCSFileSystem maintains a per-implied-directory cache of object listings and
     fulfills all object information and listing requests from cache. This implied, for example, that objects
     created via other processes *will not* be visible to the GCSFileSystem until the cache
-    refreshed. Calls to GCSFileSystem.open and calls to GCSFile are not effected by this cache.
+    refreshed. Calls to GCSFileSystem.open and calls to GCSFile are not effected by this cache;
+    they fetch the object's details afresh unless ``details_cache_timeout`` is set.
 
     In the default case the cache is never expired. This may be controlled via the ``cache_timeout``
-    GCSFileSystem parameter or via explicit calls to ``GCSFileSystem.invalidate_cache``.
+    GCSFileSystem parameter or via explicit calls to ``GCSFileSystem.invalidate_cache``. The cache
+    is also unbounded by default; pass ``max_paths`` to keep only that many most recently used
+    listings, e.g., when ``find`` is run over very large buckets.
 
     Parameters
     ----------
@@ -230,11 +427,20 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         e.g., access control.
     token: None, dict or string
         (see description of authentication methods, above)
+    block_size: int
+        Default buffer size for files opened with ``open()``. If not given,
+        files are read in blocks of 16MiB (or ``GCSFS_READ_BLOCK_SIZE_MB``
+        from the environment) and written in blocks of 5MiB.
     consistency: 'none', 'size', 'md5'
         Check method when writing files. Can be overridden in open().
     cache_timeout: float, seconds
         Cache expiration time in seconds for object metadata cache.
         Set cache_timeout <= 0 for no caching, None for no cache expiration.
+    details_cache_timeout: float, seconds
+        How long the details fetched when opening a file for reading are
+        reused by later opens of the same path and generation, saving a
+        metadata request each. Writes and ``invalidate_cache`` through this
+        instance drop them. Default 0, no caching; None for no expiration.
     secure_serialize: bool (deprecated)
     requester_pays : bool, or str default False
         Whether to use requester-pays requests. This will include your
@@ -243,7 +449,9 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         pass a project-id here as a string to use that as the `userProject`.
     session_kwargs: dict
         passed on to ``aiohttp.ClientSession``; can contain, for example,
-        proxy settings.
+        proxy settings. Unless a ``connector`` is given, a ``TCPConnector``
+        with longer DNS-cache and keep-alive timeouts is used. JSON request
+        bodies are encoded with ``orjson`` when it is installed.
     endpoint_url: str
         If given, use this URL (format protocol://host:port , *without* any
         path part) for communication. If not given, defaults to the value
@@ -261,6 +469,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     scopes = {"read_only", "read_write", "full_control"}
     retries = 6  # number of retries on http failure
     default_block_size = DEFAULT_BLOCK_SIZE
+    default_read_block_size = DEFAULT_READ_BLOCK_SIZE
     protocol = "gs", "gcs"
     async_impl = True
 
@@ -272,6 +481,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         block_size=None,
         consistency="none",
         cache_timeout=None,
+        details_cache_timeout=0,
         secure_serialize=True,
         check_connection=None,
         requests_timeout=None,
@@ -293,18 +503,34 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             loop=loop,
             **kwargs,
         )
+        self.dircache = IndexedDirCache(
+            self.dircache.use_listings_cache,
+            self.dircache.listings_expiry_time,
+            self.dircache.max_paths,
+        )
         if access not in self.scopes:
             raise ValueError("access must be one of {}", self.scopes)
         if project is None:
             warnings.warn("GCS project not set - cannot list or create buckets")
         if block_size is not None:
             self.default_block_size = block_size
+            self.default_read_block_size = block_size
         self.requester_pays = requester_pays
         self.consistency = consistency
         self.cache_timeout = cache_timeout or kwargs.pop("listings_expiry_time", None)
+        self.details_cache_timeout = details_cache_timeout
+        # (path, generation) -> (time fetched, details), see _cached_details
+        self._details_cache = OrderedDict()
         self.requests_timeout = requests_timeout
         self.timeout = timeout
         self._session = None
+        self._base_headers = None
+        self._base_headers_creds = None
+        self._base_headers_token = None
+        self._auth_headers = None
+        self._token_checked = 0
+        self._storage_client = None
+        self._storage_client_creds = None
         self._endpoint = endpoint_url
         self.session_kwargs = session_kwargs or {}
         self.default_location = default_location
@@ -330,6 +556,15 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     def project(self):
         return self.credentials.project
 
+    @property
+    def requests_timeout(self):
+        return self._requests_timeout.total
+
+    @requests_timeout.setter
+    def requests_timeout(self, value):
+        # built here rather than by aiohttp on every request
+        self._requests_timeout = aiohttp.ClientTimeout(total=value)
+
     # Clean up the aiohttp session
     #
     # This can run from the main thread if invoked via the weakref callbcak.
@@ -357,7 +592,20 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
     async def _set_session(self):
         if self._session is None:
-            self._session = await get_client(**self.session_kwargs)
+            kwargs = self.session_kwargs
+            if "connector" not in kwargs:
+                # keep connections and DNS results around for longer than
+                # aiohttp's defaults (15s, 10s), since all requests go to the
+                # same few hosts
+                kwargs = dict(
+                    kwargs,
+                    connector=aiohttp.TCPConnector(
+                        ttl_dns_cache=300, keepalive_timeout=60
+                    ),
+                )
+            if "json_serialize" not in kwargs:
+                kwargs = dict(kwargs, json_serialize=json_dumps)
+            self._session = await get_client(**kwargs)
             weakref.finalize(self, self.close_session, self.loop, self._session)
         return self._session
 
@@ -370,14 +618,13 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     @classmethod
     def _strip_protocol(cls, path):
         if isinstance(path, list):
-            return [cls._strip_protocol(p) for p in path]
+            strip = cls._strip_protocol
+            return [strip(p) for p in path]
         path = stringify_path(path)
-        protos = (cls.protocol,) if isinstance(cls.protocol, str) else cls.protocol
-        for protocol in protos:
-            if path.startswith(protocol + "://"):
-                path = path[len(protocol) + 3 :]
-            elif path.startswith(protocol + "::"):
-                path = path[len(protocol) + 2 :]
+        for prefix, n in _protocol_prefixes(cls.protocol):
+            if path.startswith(prefix):
+                path = path[n:]
+                break
         # use of root_marker to make minimum required path, e.g., "/"
         return path or cls.root_marker
 
@@ -389,6 +636,9 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         return {}
 
     def _get_params(self, kwargs):
+        if not self.requester_pays and None not in kwargs.values():
+            # nothing to filter or add; callers do not mutate the result
+            return kwargs
         params = {k: v for k, v in kwargs.items() if v is not None}
         # needed for requester pays buckets
         if self.requester_pays:
@@ -400,20 +650,47 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         return params
 
     def _get_headers(self, headers):
-        out = {}
-        if headers is not None:
-            out.update(headers)
-        if "User-Agent" not in out:
-            out["User-Agent"] = "python-gcsfs/" + version
-        self.credentials.apply(out)
+        creds = self.credentials.credentials
+        token = getattr(creds, "token", None)
+        if (
+            self._base_headers is None
+            or self._base_headers_creds is not creds
+            or self._base_headers_token != token
+            or (creds is not None and self._token_needs_refresh(creds))
+        ):
+            # (re)build the headers common to all requests; the cached copy
+            # is reused until the credentials object or its token changes
+            auth = {}
+            self.credentials.apply(auth)
+            creds = self.credentials.credentials
+            self._auth_headers = auth
+            self._base_headers = {"User-Agent": "python-gcsfs/" + version, **auth}
+            self._base_headers_creds = creds
+            self._base_headers_token = getattr(creds, "token", None)
+            self._token_checked = time.monotonic()
+        if not headers:
+            return self._base_headers
+        out = self._base_headers.copy()
+        out.update(headers)
+        out.update(self._auth_headers)
         return out
 
+    def _token_needs_refresh(self, creds):
+        # google-auth reports tokens as invalid minutes before they expire,
+        # so requests can share one validity check per second; the refresh
+        # itself happens once, under the credentials' lock.
+        now = time.monotonic()
+        if now < self._token_checked + 1:
+            return False
+        self._token_checked = now
+        return not creds.valid
+
     def _format_path(self, path, args):
         if not path.startswith("http"):
             path = self.base + path
 
         if args:
-            path = path.format(*[quote(p) for p in args])
+            path = path.format(*map(quote, args))
         return path
 
     @retry_request(retries=retries)
@@ -430,7 +707,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             json=json,
             headers=self._get_headers(headers),
             data=data,
-            timeout=self.requests_timeout,
+            timeout=self._requests_timeout,
         ) as r:
             status = r.status
             headers = r.headers
@@ -443,12 +720,13 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     async def _call(
         self, method, path, *args, json_out=False, info_out=False, **kwargs
     ):
-        logger.debug(f"{method.upper()}: {path}, {args}, {kwargs.get('headers')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{method.upper()}: {path}, {args}, {kwargs.get('headers')}")
         status, headers, info, contents = await self._request(
             method, path, *args, **kwargs
         )
         if json_out:
-            return json.loads(contents)
+            return json_loads(contents)
         elif info_out:
             return info
         else:
@@ -475,7 +753,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         """
         result = dict(object_metadata)
         result["size"] = int(object_metadata.get("size", 0))
-        result["name"] = posixpath.join(bucket, object_metadata["name"])
+        result["name"] = f"{bucket}/{object_metadata['name']}"
         result["type"] = "file"
         # Translate time metadata from GCS names to fsspec standard names.
         # TODO(issues/559): Remove legacy names `updated` and `timeCreated`?
@@ -489,6 +767,36 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
         return result
 
+    def _process_objects_batch(self, bucket, items):
+        """Process a page of listed object resources into gcsfs format.
+
+        Equivalent to calling ``_process_object`` on each item, but the
+        items are updated in place instead of copied: listing pages are
+        freshly decoded from the response and not referenced elsewhere.
+        Returns the same list.
+        """
+        parse_timestamp = self._parse_timestamp
+        intern = sys.intern
+        for object_metadata in items:
+            # share the string values repeated across the whole listing
+            for field in _INTERNED_FIELDS:
+                if field in object_metadata:
+                    object_metadata[field] = intern(object_metadata[field])
+            object_metadata["size"] = int(object_metadata.get("size", 0))
+            object_metadata["name"] = f"{bucket}/{object_metadata['name']}"
+            object_metadata["type"] = "file"
+            if "updated" in object_metadata:
+                object_metadata["mtime"] = parse_timestamp(object_metadata["updated"])
+            if "timeCreated" in object_metadata:
+                object_metadata["ctime"] = parse_timestamp(
+                    object_metadata["timeCreated"]
+                )
+            if "generation" in object_metadata:
+                object_metadata.setdefault("metageneration", None)
+            elif "metageneration" in object_metadata:
+                object_metadata["generation"] = None
+        return items
+
     async def _make_bucket_requester_pays(self, path, state=True):
         # this is really some form of setACL/chmod
         # perhaps should be automatic if gcs.requester_pays
@@ -497,6 +805,34 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
     make_bucket_requester_pays = asyn.sync_wrapper(_make_bucket_requester_pays)
 
+    def _ls_from_cache(self, path):
+        """Check cache for listing
+
+        Returns listing, if found (may be empty list for a directory that exists
+        but contains nothing), None if not in cache.
+
+        Entries in the parent's listing are found via a name index, built
+        once per cached listing, instead of by scanning the whole listing.
+        """
+        try:
+            return self.dircache[path.rstrip("/")]
+        except KeyError:
+            pass
+        parent = self._parent(path)
+        try:
+            index = self.dircache.index(parent)
+        except KeyError:
+            return None
+        files = list(index.get(path, ()))
+        if path.endswith("/"):
+            files.extend(
+                f for f in index.get(path.rstrip("/"), ()) if f["type"] == "directory"
+            )
+        if not files:
+            # parent dir was listed but did not contain this file
+            raise FileNotFoundError(path)
+        return files
+
     async def _get_object(self, path):
         """Return object information at the given path."""
         bucket, key, generation = self.split_path(path)
@@ -604,9 +940,21 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         return out
 
     async def _do_list_objects(
-        self, path, max_results=None, delimiter="/", prefix="", versions=False, **kwargs
+        self,
+        path,
+        max_results=None,
+        delimiter="/",
+        prefix="",
+        versions=False,
+        parallel_shards=None,
+        **kwargs,
     ):
-        """Object listing for the given {bucket}/{prefix}/ path."""
+        """Object listing for the given {bucket}/{prefix}/ path.
+
+        If ``parallel_shards`` is given, the listing is split into that many
+        name ranges which are paged through concurrently; this trades extra
+        requests (some ranges may be empty) for fewer sequential round trips.
+        """
         bucket, _path, generation = self.split_path(path)
         _path = "" if not _path else _path.rstrip("/") + "/"
         prefix = f"{_path}{prefix}" or None
@@ -643,6 +991,18 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                 page_size=default_page_size,
             )
 
+        # If the user asked for sharded listing, list ranges of names split on
+        # the first character after the prefix concurrently.
+        elif parallel_shards and parallel_shards > 1:
+            return await self._list_object_ranges(
+                splits=_shard_offsets(prefix or "", parallel_shards),
+                bucket=bucket,
+                delimiter=delimiter,
+                prefix=prefix,
+                versions=versions,
+                page_size=default_page_size,
+            )
+
         # If the user has not configured inventory report, proceed to use
         # sequential listing.
         else:
@@ -665,40 +1025,38 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         """
 
         # Extract out the names of the objects fetched from the inventory report.
-        snapshot_object_names = sorted([item["name"] for item in items])
+        snapshot_object_names = sorted(item["name"] for item in items)
 
         # Determine the number of coroutines needed to concurrent listing.
         # Ideally, want each coroutine to fetch a single page of objects.
         num_coroutines = len(snapshot_object_names) // page_size + 1
         num_objects_per_coroutine = len(snapshot_object_names) // num_coroutines
 
-        start_offsets = []
-        end_offsets = []
-
-        # Calculate the split splits of each coroutine (start offset and end offset).
-        for i in range(num_coroutines):
-            range_start = i * num_objects_per_coroutine
-            if i == num_coroutines - 1:
-                range_end = len(snapshot_object_names)
-            else:
-                range_end = range_start + num_objects_per_coroutine
-
-            if range_start == 0:
-                prefix_start = None
-            else:
-                prefix_start = snapshot_object_names[range_start]
-
-            if range_end == len(snapshot_object_names):
-                prefix_end = None
-            else:
-                prefix_end = snapshot_object_names[range_end]
-
-            start_offsets.append(prefix_start)
-            end_offsets.append(prefix_end)
+        # Calculate the splits of each coroutine: each one lists from its
+        # start offset up to the next one's, with open ends at either side.
+        splits = [
+            snapshot_object_names[i * num_objects_per_coroutine]
+            for i in range(1, num_coroutines)
+        ]
+        return await self._list_object_ranges(
+            splits, bucket, delimiter, prefix, versions, page_size
+        )
 
-        # Assign the coroutine all at once, and wait for them to finish listing.
-        results = await asyncio.gather(
-            *[
+    async def _list_object_ranges(
+        self, splits, bucket, delimiter, prefix, versions, page_size
+    ):
+        """
+        Lists objects in the ranges between consecutive ``splits`` (plus the
+        open ranges before the first and after the last) concurrently.
+        """
+        start_offsets = [None, *splits]
+        end_offsets = [*splits, None]
+
+        # Run the coroutines with bounded concurrency (the instance's
+        # ``batch_size``, or fsspec's configured default), starting a new one
+        # as soon as any finishes, and wait for them to finish listing.
+        results = await asyn._run_coros_in_chunks(
+            [
                 self._sequential_list_objects_helper(
                     bucket=bucket,
                     delimiter=delimiter,
@@ -709,7 +1067,9 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                     page_size=page_size,
                 )
                 for i in range(0, len(start_offsets))
-            ]
+            ],
+            batch_size=self.batch_size,
+            nofiles=True,
         )
 
         items = []
@@ -721,7 +1081,8 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             items.extend(items_from_process)
             prefixes.extend(prefixes_from_process)
 
-        return items, prefixes
+        # The same common prefix may be reported by neighbouring ranges.
+        return items, list(dict.fromkeys(prefixes))
 
     async def _sequential_list_objects_helper(
         self,
@@ -740,21 +1101,22 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         prefixes = []
         items = []
 
-        page = await self._call(
-            "GET",
-            "b/{}/o",
-            bucket,
-            delimiter=delimiter,
-            prefix=prefix,
-            startOffset=start_offset,
-            endOffset=end_offset,
-            maxResults=page_size,
-            json_out=True,
-            versions="true" if versions else None,
-        )
+        # The query is the same for every page, bar the page token; dropping
+        # unset values once lets each request use it as is.
+        params = {
+            "delimiter": delimiter,
+            "prefix": prefix,
+            "startOffset": start_offset,
+            "endOffset": end_offset,
+            "maxResults": page_size,
+            "versions": "true" if versions else None,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+
+        page = await self._call("GET", "b/{}/o", bucket, json_out=True, **params)
 
         prefixes.extend(page.get("prefixes", []))
-        items.extend(page.get("items", []))
+        items.extend(self._process_objects_batch(bucket, page.get("items", ())))
         next_page_token = page.get("nextPageToken", None)
 
         while next_page_token is not None:
@@ -762,23 +1124,15 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                 "GET",
                 "b/{}/o",
                 bucket,
-                delimiter=delimiter,
-                prefix=prefix,
-                startOffset=start_offset,
-                endOffset=end_offset,
-                maxResults=page_size,
                 pageToken=next_page_token,
                 json_out=True,
-                versions="true" if versions else None,
+                **params,
             )
 
-            assert page["kind"] == "storage#objects"
             prefixes.extend(page.get("prefixes", []))
-            items.extend(page.get("items", []))
+            items.extend(self._process_objects_batch(bucket, page.get("items", ())))
             next_page_token = page.get("nextPageToken", None)
 
-        items = [self._process_object(bucket, i) for i in items]
-
         return items, prefixes
 
     async def _list_buckets(self):
@@ -800,7 +1154,6 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                     json_out=True,
                 )
 
-                assert page["kind"] == "storage#buckets"
                 items.extend(page.get("items", []))
                 next_page_token = page.get("nextPageToken", None)
 
@@ -825,13 +1178,45 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         if path is None:
             logger.debug("invalidate_cache clearing cache")
             self.dircache.clear()
+            self._details_cache.clear()
         else:
             path = self._strip_protocol(path).rstrip("/")
+            if self._details_cache:
+                prefix = path + "/"
+                self._drop_details(lambda p: p == path or p.startswith(prefix))
 
             while path:
                 self.dircache.pop(path, None)
                 path = self._parent(path)
 
+    def _drop_details(self, match):
+        """Forget cached file details whose path satisfies ``match``"""
+        # files opened in other threads may add entries meanwhile
+        for k in list(self._details_cache):
+            if match(k[0]):
+                self._details_cache.pop(k, None)
+
+    def _cached_details(self, path, generation=None):
+        """``info`` of a file being opened, reused for ``details_cache_timeout``"""
+        timeout = self.details_cache_timeout
+        if timeout is not None and timeout <= 0:
+            return self.info(path, generation=generation)
+        bucket, key, path_generation = self.split_path(path)
+        k = (f"{bucket}/{key}", _coalesce_generation(generation, path_generation))
+        now = time.monotonic()
+        hit = self._details_cache.pop(k, None)
+        if hit is not None and (timeout is None or now - hit[0] < timeout):
+            self._details_cache[k] = hit
+            return hit[1]
+        details = self.info(path, generation=generation)
+        if len(self._details_cache) >= DETAILS_CACHE_SIZE:
+            try:
+                self._details_cache.popitem(last=False)
+            except KeyError:  # emptied by another thread
+                pass
+        self._details_cache[k] = (now, details)
+        return details
+
     async def _mkdir(
         self,
         path,
@@ -949,6 +1334,9 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
     def _parse_timestamp(self, timestamp):
         assert timestamp.endswith("Z")
+        if sys.version_info >= (3, 11):
+            # parses "Z" and fractions of any length itself
+            return datetime.fromisoformat(timestamp)
         timestamp = timestamp[:-1]
         timestamp = timestamp + "0" * (6 - len(timestamp.rsplit(".", 1)[1]))
         return datetime.fromisoformat(timestamp + "+00:00")
@@ -973,12 +1361,17 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         parent_cache = self._ls_from_cache(parent_path)
         bucket, key, path_generation = self.split_path(path)
         generation = _coalesce_generation(generation, path_generation)
-        if parent_cache:
+        # unless the parent itself was listed, parent_cache only holds its own
+        # entry from the grandparent's listing, with no children to find
+        if (
+            parent_cache
+            and not key.endswith("/")
+            and self.dircache.get(parent_path) is parent_cache
+        ):
             name = "/".join((bucket, key))
-            for o in parent_cache:
-                if o["name"].rstrip("/") == name and (
-                    not generation or o.get("generation") == generation
-                ):
+            index = self.dircache.index(parent_path)
+            for o in (*index.get(name, ()), *index.get(name + "/", ())):
+                if not generation or o.get("generation") == generation:
                     return o
         if self._ls_from_cache(path):
             # this is a directory
@@ -1018,7 +1411,11 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     async def _ls(
         self, path, detail=False, prefix="", versions=False, refresh=False, **kwargs
     ):
-        """List objects under the given '/{bucket}/{prefix} path."""
+        """List objects under the given '/{bucket}/{prefix} path.
+
+        Pass ``parallel_shards=n`` to list a large directory as up to ``n``
+        name ranges concurrently rather than page after page.
+        """
         path = self._strip_protocol(path).rstrip("/")
 
         if refresh:
@@ -1026,14 +1423,26 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         if path in ["/", ""]:
             out = await self._list_buckets()
         else:
-            out = []
-            for entry in await self._list_objects(
+            out = await self._list_objects(
                 path, prefix=prefix, versions=versions, **kwargs
-            ):
-                if versions and "generation" in entry:
-                    entry = entry.copy()
-                    entry["name"] = f"{entry['name']}#{entry['generation']}"
-                out.append(entry)
+            )
+            if versions and not detail:
+                return sorted(
+                    f"{o['name']}#{o['generation']}" if "generation" in o else o["name"]
+                    for o in out
+                )
+            elif versions:
+                out = [
+                    (
+                        {**o, "name": f"{o['name']}#{o['generation']}"}
+                        if "generation" in o
+                        else o
+                    )
+                    for o in out
+                ]
+            elif detail:
+                # a new list, not the one held by the listings cache
+                out = list(out)
 
         if detail:
             return out
@@ -1042,14 +1451,11 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
     def url(self, path):
         """Get HTTP URL of the given path"""
-        u = "{}/download/storage/v1/b/{}/o/{}?alt=media{}"
         bucket, object, generation = self.split_path(path)
-        object = quote(object)
-        return u.format(
-            self._location,
-            bucket,
-            object,
-            f"&generation={generation}" if generation else "",
+        query = f"&generation={generation}" if generation else ""
+        return (
+            f"{self._location}/download/storage/v1/b/{bucket}/o/{quote(object)}"
+            f"?alt=media{query}"
         )
 
     async def _cat_file(self, path, start=None, end=None, **kwargs):
@@ -1128,6 +1534,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             json=i_json,
             json_out=True,
         )
+        self._drop_details(f"{bucket}/{key}".__eq__)
         return o_json.get("metadata", {})
 
     setxattrs = asyn.sync_wrapper(_setxattrs)
@@ -1149,6 +1556,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                 "destination": {"name": key, "bucket": bucket},
             },
         )
+        self._drop_details(f"{bucket}/{key}".__eq__)
 
     merge = asyn.sync_wrapper(_merge)
 
@@ -1197,16 +1605,18 @@ class GCSFileSystem(asyn.AsyncFileSystem):
     async def _rm_files(self, paths):
         import random
 
-        template = (
-            "\n--===============7330845974216740156==\n"
-            "Content-Type: application/http\n"
-            "Content-Transfer-Encoding: binary\n"
-            "Content-ID: <b29c5de2-0db4-490b-b421-6a51b598bd11+{i}>"
-            "\n\nDELETE /storage/v1/b/{bucket}/o/{key}{query} HTTP/1.1\n"
-            "Content-Type: application/json\n"
-            "accept: application/json\ncontent-length: 0\n"
-        )
         out = []
+        # Listings that may include any of the paths; retries only ever
+        # resend a subset of them, so this is collected once.
+        ancestors = set()
+        names = set()
+        for p in paths:
+            bucket, key, _ = self.split_path(p)
+            names.add(f"{bucket}/{key}")
+            p = self._strip_protocol(p).rstrip("/")
+            while p and p not in ancestors:
+                ancestors.add(p)
+                p = self._parent(p)
         # Splitting requests into batches
         # See https://cloud.google.com/storage/docs/batch
         for retry in range(1, 6):
@@ -1217,44 +1627,34 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                 bucket, key, generation = self.split_path(p)
                 query = f"?generation={generation}" if generation else ""
                 parts.append(
-                    template.format(
-                        i=i + 1,
-                        bucket=quote(bucket),
-                        key=quote(key),
-                        query=query,
-                    )
+                    f"{_BATCH_PART_HEAD}{i + 1}>\n\nDELETE /storage/v1/b/"
+                    f"{_quote_bucket(bucket)}/o/{quote(key)}{query} HTTP/1.1\n"
+                    f"{_BATCH_PART_TAIL}"
                 )
-            body = "".join(parts)
+            parts.append(f"\n--{_BATCH_BOUNDARY}--")
             headers, content = await self._call(
                 "POST",
                 f"{self._location}/batch/storage/v1",
-                headers={
-                    "Content-Type": 'multipart/mixed; boundary="=========='
-                    '=====7330845974216740156=="'
-                },
-                data=body + "\n--===============7330845974216740156==--",
+                headers={"Content-Type": _BATCH_CONTENT_TYPE},
+                data="".join(parts),
             )
 
-            boundary = headers["Content-Type"].split("=", 1)[1]
-            parents = set(self._parent(p) for p in paths) | set(paths)
-            [self.invalidate_cache(parent) for parent in parents]
-            txt = content.decode()
-            responses = txt.split(boundary)[1:-1]
+            boundary = headers["Content-Type"].split("=", 1)[1].encode()
+            for p in ancestors:
+                self.dircache.pop(p, None)
+            if self._details_cache:
+                self._drop_details(names.__contains__)
+            responses = content.split(boundary)[1:-1]
             for path, response in zip(paths, responses):
-                m = re.search("HTTP/[0-9.]+ ([0-9]+)", response)
-                code = int(m.groups()[0]) if m else None
+                code = _batch_response_code(response)
                 if code in [200, 204]:
                     out.append(path)
                 elif code in errs and retry < 5:
                     remaining.append(path)
                 else:
-                    msg = re.search("{(.*)}", response.replace("\n", ""))
+                    msg = _batch_response_error(response)
                     if msg:
-                        msg2 = re.search("({.*})", msg.groups()[0])
-                    else:
-                        msg2 = None
-                    if msg and msg2:
-                        out.append(OSError(msg2.groups()[0]))
+                        out.append(OSError(msg))
                     else:
                         out.append(OSError(str(path, code)))
             if remaining:
@@ -1270,8 +1670,9 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
     async def _rm(self, path, recursive=False, maxdepth=None, batchsize=20):
         paths = await self._expand_path(path, recursive=recursive, maxdepth=maxdepth)
-        files = [p for p in paths if self.split_path(p)[1]]
-        dirs = [p for p in paths if not self.split_path(p)[1]]
+        files, dirs = [], []
+        for p in paths:
+            (files if self.split_path(p)[1] else dirs).append(p)
         if self.on_google:
             # emulators do not support batch
             exs = sum(
@@ -1280,6 +1681,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                         self._rm_files(files[i : i + batchsize])
                         for i in range(0, len(files), batchsize)
                     ],
+                    batch_size=self.batch_size,
                     return_exceptions=True,
                 ),
                 [],
@@ -1351,14 +1753,17 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                 metadata,
                 fixed_key_metadata=fixed_key_metadata,
             )
-            for offset in range(0, len(data), chunksize):
-                bit = data[offset : offset + chunksize]
-                out = await upload_chunk(
-                    self, location, bit, offset, size, content_type
-                )
-
             checker = get_consistency_checker(consistency)
-            checker.update(data)
+            hashing = _update_checker(checker, data)
+            try:
+                for offset in range(0, len(data), chunksize):
+                    bit = data[offset : offset + chunksize]
+                    out = await upload_chunk(
+                        self, location, bit, offset, size, content_type
+                    )
+            finally:
+                if hashing is not None:
+                    await hashing
             checker.validate_json_response(out)
 
         self.invalidate_cache(self._parent(path))
@@ -1417,12 +1822,16 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                     bit = f0.read(chunksize)
                     if not bit:
                         break
-                    out = await upload_chunk(
-                        self, location, bit, offset, size, content_type
-                    )
+                    hashing = _update_checker(checker, bit)
+                    try:
+                        out = await upload_chunk(
+                            self, location, bit, offset, size, content_type
+                        )
+                    finally:
+                        if hashing is not None:
+                            await hashing
                     offset += len(bit)
                     callback.absolute_update(offset)
-                    checker.update(bit)
 
                 checker.validate_json_response(out)
 
@@ -1442,8 +1851,14 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         prefix="",
         versions=False,
         maxdepth=None,
+        parallel_shards=None,
         **kwargs,
     ):
+        """List all files below path, recursively.
+
+        Pass ``parallel_shards=n`` to list up to ``n`` name ranges concurrently
+        rather than page after page, which is faster for large trees.
+        """
         path = self._strip_protocol(path)
 
         if maxdepth is not None and maxdepth < 1:
@@ -1451,7 +1866,11 @@ class GCSFileSystem(asyn.AsyncFileSystem):
 
         # Fetch objects as if the path is a directory
         objects, _ = await self._do_list_objects(
-            path, delimiter="", prefix=prefix, versions=versions
+            path,
+            delimiter="",
+            prefix=prefix,
+            versions=versions,
+            parallel_shards=parallel_shards,
         )
 
         if not objects:
@@ -1463,21 +1882,37 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             else:
                 _prefix = key
             objects, _ = await self._do_list_objects(
-                bucket, delimiter="", prefix=_prefix, versions=versions
+                bucket,
+                delimiter="",
+                prefix=_prefix,
+                versions=versions,
+                parallel_shards=parallel_shards,
             )
 
         dirs = {}
         cache_entries = {}
 
         for obj in objects:
-            parent = self._parent(obj["name"])
+            name = obj["name"]
             previous = obj
 
-            while parent:
+            # ancestors are the prefixes of the name up to each slash
+            i = name.rfind("/")
+            while i > 0:
+                parent = name[:i]
                 dir_key = self.split_path(parent)[1]
                 if not dir_key or len(parent) < len(path):
                     break
 
+                listing = cache_entries.setdefault(parent, {})
+                child = previous["name"]
+                if child not in listing:
+                    listing[child] = previous
+
+                if parent in dirs:
+                    # the rest of the way up was walked from an earlier object
+                    break
+
                 dirs[parent] = {
                     "Key": dir_key,
                     "Size": 0,
@@ -1487,13 +1922,8 @@ class GCSFileSystem(asyn.AsyncFileSystem):
                     "size": 0,
                 }
 
-                listing = cache_entries.setdefault(parent, {})
-                name = previous["name"]
-                if name not in listing:
-                    listing[name] = previous
-
                 previous = dirs[parent]
-                parent = self._parent(parent)
+                i = name.rfind("/", 0, i)
 
         if not prefix:
             cache_entries_list = {k: list(v.values()) for k, v in cache_entries.items()}
@@ -1505,7 +1935,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         if maxdepth:
             # Filter returned objects based on requested maxdepth
             depth = path.rstrip("/").count("/") + maxdepth
-            objects = list(filter(lambda o: o["name"].count("/") <= depth, objects))
+            objects = [o for o in objects if o["name"].count("/") <= depth]
 
         if detail:
             if versions:
@@ -1526,7 +1956,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             url=rpath,
             params=self._get_params(kwargs),
             headers=self._get_headers(headers),
-            timeout=self.requests_timeout,
+            timeout=self._requests_timeout,
         ) as r:
             r.raise_for_status()
             try:
@@ -1540,7 +1970,7 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             os.makedirs(lparent, exist_ok=True)
             with open(lpath, "wb") as f2:
                 while True:
-                    data = await r.content.read(4096 * 32)
+                    data = await r.content.read(2**20)
                     if not data:
                         break
                     f2.write(data)
@@ -1579,7 +2009,10 @@ class GCSFileSystem(asyn.AsyncFileSystem):
             If None, use default for this instance
         """
         if block_size is None:
-            block_size = self.default_block_size
+            if "r" in mode:
+                block_size = self.default_read_block_size
+            else:
+                block_size = self.default_block_size
         const = consistency or self.consistency
         return GCSFile(
             self,
@@ -1596,10 +2029,13 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def _split_path(cls, path, version_aware=False):
         """
         Normalise GCS path string into bucket and key.
 
+        Results are memoised, as the same paths tend to be split repeatedly.
+
         Parameters
         ----------
         path : string
@@ -1620,23 +2056,28 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         bucket, keypart = path.split("/", 1)
         key = keypart
         generation = None
-        if version_aware:
-            parts = urlsplit(keypart)
-            try:
-                if parts.fragment:
-                    generation = parts.fragment
-                elif parts.query:
-                    parsed = parse_qs(parts.query)
-                    if "generation" in parsed:
-                        generation = parsed["generation"][0]
-                # Sanity check whether this could be a valid generation ID. If
-                # it is not, assume that # or ? characters are supposed to be
-                # part of the object name.
-                if generation is not None:
-                    int(generation)
-                    key = parts.path
-            except ValueError:
-                generation = None
+        # only keys with a fragment or query can carry a generation
+        if version_aware and ("#" in keypart or "?" in keypart):
+            # the key is not a full URL, so find the fragment and query
+            # directly rather than with urlsplit/parse_qs
+            keypath, _, fragment = keypart.partition("#")
+            keypath, _, query = keypath.partition("?")
+            if fragment:
+                generation = fragment
+            elif query:
+                for param in query.split("&"):
+                    name, _, value = param.partition("=")
+                    if name == "generation" and value:
+                        generation = value
+                        break
+            # Sanity check whether this could be a valid generation ID. If
+            # it is not, assume that # or ? characters are supposed to be
+            # part of the object name.
+            if generation is not None:
+                if generation.isascii() and generation.isdigit():
+                    key = keypath
+                else:
+                    generation = None
         return (
             bucket,
             key,
@@ -1663,10 +2104,15 @@ class GCSFileSystem(asyn.AsyncFileSystem):
         """
         from google.cloud import storage
 
-        client = storage.Client(
-            credentials=self.credentials.credentials,
-            project=self.project,
-        )
+        # reuse the client for as long as the credentials object stays the same
+        creds = self.credentials.credentials
+        if self._storage_client is None or self._storage_client_creds is not creds:
+            self._storage_client = storage.Client(
+                credentials=creds,
+                project=self.project,
+            )
+            self._storage_client_creds = creds
+        client = self._storage_client
 
         bucket, key, generation = self.split_path(path)
         bucket = client.bucket(bucket)
@@ -1689,7 +2135,7 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         gcsfs,
         path,
         mode="rb",
-        block_size=DEFAULT_BLOCK_SIZE,
+        block_size=None,
         autocommit=True,
         cache_type="readahead",
         cache_options=None,
@@ -1713,7 +2159,8 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         mode: str
             Normal file modes. Currently only 'wb' amd 'rb'.
         block_size: int
-            Buffer size for reading or writing
+            Buffer size for reading or writing. If None, the filesystem's
+            default for the mode, as in ``GCSFileSystem.open``.
         acl: str
             ACL to apply, if any, one of ``ACLs``. New files are normally
             "bucketownerfullcontrol", but a default can be configured per
@@ -1746,6 +2193,11 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         if not key:
             raise OSError("Attempt to open a bucket")
         self.generation = _coalesce_generation(generation, path_generation)
+        if block_size is None:
+            if "r" in mode:
+                block_size = gcsfs.default_read_block_size
+            else:
+                block_size = gcsfs.default_block_size
         super().__init__(
             gcsfs,
             path,
@@ -1761,6 +2213,8 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         self.key = key
         self.acl = acl
         self.checker = get_consistency_checker(consistency)
+        # (start, end, data) of the last ranged fetch, see _fetch_range
+        self._ra_buf = None
 
         if "r" in self.mode:
             det = self.details
@@ -1782,7 +2236,7 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
     @property
     def details(self):
         if self._details is None:
-            self._details = self.fs.info(self.path, generation=self.generation)
+            self._details = self.fs._cached_details(self.path, self.generation)
         return self._details
 
     def info(self):
@@ -1803,8 +2257,8 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         """
         while True:
             # shortfall splits blocks bigger than max allowed upload
+            # (BytesIO hands over its bytes object here rather than copying)
             data = self.buffer.getvalue()
-            head = {}
             l = len(data)
 
             if (l < GCS_MIN_BLOCK_SIZE) and (not final or not self.autocommit):
@@ -1817,34 +2271,31 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
             # Select the biggest possible chunk of data to be uploaded
             chunk_length = min(l, GCS_MAX_BLOCK_SIZE)
             chunk = data[:chunk_length]
+            last = self.offset + chunk_length - 1
             if final and self.autocommit and chunk_length == l:
                 if l:
                     # last chunk
-                    head["Content-Range"] = "bytes %i-%i/%i" % (
-                        self.offset,
-                        self.offset + chunk_length - 1,
-                        self.offset + l,
-                    )
+                    content_range = f"bytes {self.offset}-{last}/{self.offset + l}"
                 else:
                     # closing when buffer is empty
-                    head["Content-Range"] = "bytes */%i" % self.offset
+                    content_range = f"bytes */{self.offset}"
                     data = None
             else:
-                head["Content-Range"] = "bytes %i-%i/*" % (
-                    self.offset,
-                    self.offset + chunk_length - 1,
-                )
-            head.update(
-                {"Content-Type": self.content_type, "Content-Length": str(chunk_length)}
-            )
+                content_range = f"bytes {self.offset}-{last}/*"
+            head = {
+                "Content-Range": content_range,
+                "Content-Type": self.content_type,
+                "Content-Length": str(chunk_length),
+            }
+            # see upload_chunk for why the body goes in a BytesIO
             headers, contents = self.gcsfs.call(
-                "POST", self.location, headers=head, data=chunk
+                "POST", self.location, headers=head, data=UnclosableBytesIO(chunk)
             )
             if "Range" in headers:
                 end = int(headers["Range"].split("-")[1])
                 shortfall = (self.offset + l - 1) - end
                 if shortfall > 0:
-                    self.checker.update(data[:-shortfall])
+                    self.checker.update(memoryview(data)[:-shortfall])
                     self.buffer = UnclosableBytesIO(data[-shortfall:])
                     self.buffer.seek(shortfall)
                     self.offset += l - shortfall
@@ -1852,9 +2303,12 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
                 else:
                     self.checker.update(data)
             else:
-                assert final, "Response looks like upload is over"
+                if not final:
+                    raise OSError(
+                        "Response looks like upload is over before final chunk"
+                    )
                 if l:
-                    j = json.loads(contents)
+                    j = json_loads(contents)
                     self.checker.update(data)
                     self.checker.validate_json_response(j)
             # Clear buffer and update offset when all is received
@@ -1920,6 +2374,22 @@ class GCSFile(fsspec.spec.AbstractBufferedFile):
         start, end : None or integers
             if not both None, fetch only given range
         """
+        if start is None or end is None or start < 0 or end < 0:
+            return self._fetch(start, end)
+        if self._ra_buf is not None:
+            buf_start, buf_end, data = self._ra_buf
+            if buf_start <= start and end <= buf_end:
+                return data[start - buf_start : end - buf_start]
+        if end - start >= MIN_READ_AHEAD_SIZE:
+            return self._fetch(start, end)
+        # a short response means the object ended before buf_end, so slicing
+        # the data for any range inside the buffer is still correct
+        buf_end = start + MIN_READ_AHEAD_SIZE
+        data = self._fetch(start, buf_end)
+        self._ra_buf = (start, buf_end, data)
+        return data[: end - start]
+
+    def _fetch(self, start, end):
         try:
             return self.gcsfs.cat_file(self.path, start=start, end=end)
         except RuntimeError as e:
@@ -1948,31 +2418,60 @@ def _convert_fixed_key_metadata(metadata, *, from_google=False):
     if metadata is None:
         return out
 
-    for key, attribute_name in SUPPORTED_FIXED_KEY_METADATA.items():
-        src = key if not from_google else attribute_name
-        dst = attribute_name if not from_google else key
+    if from_google:
+        keys = _FIXED_KEY_METADATA_FROM_GOOGLE
+    else:
+        keys = _FIXED_KEY_METADATA_TO_GOOGLE
+    for src, dst in keys:
         if src in metadata:
             out[dst] = metadata[src]
     return out
 
 
+def _update_checker(checker, data):
+    """Feed ``data`` to ``checker``
+
+    hashlib and google-crc32c release the GIL on large inputs, so MD5 and CRC32C
+    digests of those are computed in a thread, and the returned future lets the
+    caller overlap that with the upload of the same data. Anything else is done
+    here, where a thread hop would cost more than the update, returning None.
+    """
+    if len(data) >= THREADED_HASH_MIN_SIZE and isinstance(
+        checker, (MD5Checker, Crc32cChecker)
+    ):
+        return asyncio.get_running_loop().run_in_executor(None, checker.update, data)
+    checker.update(data)
+
+
 async def upload_chunk(fs, location, data, offset, size, content_type):
-    head = {}
-    l = len(data)
-    range = "bytes %i-%i/%i" % (offset, offset + l - 1, size)
-    head["Content-Range"] = range
-    head.update({"Content-Type": content_type, "Content-Length": str(l)})
-    headers, txt = await fs._call(
-        "POST", location, headers=head, data=UnclosableBytesIO(data)
-    )
-    if "Range" in headers:
-        end = int(headers["Range"].split("-")[1])
+    end = None
+    while True:
+        l = len(data)
+        head = {
+            "Content-Range": f"bytes {offset}-{offset + l - 1}/{size}",
+            "Content-Type": content_type,
+            "Content-Length": str(l),
+        }
+        # a BytesIO over bytes shares the buffer rather than copying it, and
+        # aiohttp streams it, where raw bytes over 1MiB get a ResourceWarning
+        headers, txt = await fs._call(
+            "POST", location, headers=head, data=UnclosableBytesIO(data)
+        )
+        if "Range" not in headers:
+            break
+        last_end, end = end, int(headers["Range"].split("-")[1])
         shortfall = (offset + l - 1) - end
-        if shortfall:
-            return await upload_chunk(
-                fs, location, data[-shortfall:], end, size, content_type
+        if shortfall <= 0:
+            break
+        if end == last_end:
+            raise OSError(
+                f"Upload to {location} stalled: server still reports bytes up to "
+                f"{end} persisted after resending the rest of the chunk"
             )
-    return json.loads(txt) if txt else None
+        # resend only the bytes the server has not persisted yet
+        data = data[-shortfall:]
+        offset = end + 1
+    return json_loads(txt) if txt else None
 
 
 async def initiate_upload(
@@ -1989,7 +2488,7 @@ async def initiate_upload(
     j.update(_convert_fixed_key_metadata(fixed_key_metadata))
     headers, _ = await fs._call(
         method="POST",
-        path=f"{fs._location}/upload/storage/v1/b/{quote(bucket)}/o",
+        path=f"{fs._location}/upload/storage/v1/b/{_quote_bucket(bucket)}/o",
         uploadType="resumable",
         json=j,
         headers={"X-Upload-Content-Type": content_type},
@@ -2012,26 +2511,35 @@ async def simple_upload(
     fixed_key_metadata=None,
 ):
     checker = get_consistency_checker(consistency)
-    path = f"{fs._location}/upload/storage/v1/b/{quote(bucket)}/o"
+    path = f"{fs._location}/upload/storage/v1/b/{_quote_bucket(bucket)}/o"
     metadata = {"name": key}
     if metadatain is not None:
         metadata["metadata"] = metadatain
     metadata.update(_convert_fixed_key_metadata(fixed_key_metadata))
-    metadata = json.dumps(metadata)
-    template = (
-        "--==0=="
-        "\nContent-Type: application/json; charset=UTF-8"
-        "\n\n" + metadata + "\n--==0==" + f"\nContent-Type: {content_type}" + "\n\n"
-    )
-
-    data = template.encode() + datain + b"\n--==0==--"
-    j = await fs._call(
-        "POST",
-        path,
-        uploadType="multipart",
-        headers={"Content-Type": 'multipart/related; boundary="==0=="'},
-        data=UnclosableBytesIO(data),
-        json_out=True,
+    # a single copy of the data; an iterator body could not be replayed by
+    # retries, which rewind the BytesIO below
+    data = b"".join(
+        (
+            _UPLOAD_PART_METADATA,
+            _json_dumpb(metadata),
+            _UPLOAD_PART_DATA,
+            content_type.encode(),
+            b"\n\n",
+            datain,
+            _UPLOAD_END,
+        )
     )
-    checker.update(datain)
+    hashing = _update_checker(checker, datain)
+    try:
+        j = await fs._call(
+            "POST",
+            path,
+            uploadType="multipart",
+            headers={"Content-Type": 'multipart/related; boundary="==0=="'},
+            data=UnclosableBytesIO(data),
+            json_out=True,
+        )
+    finally:
+        if hashing is not None:
+            await hashing
     checker.validate_json_response(j)
@@ -95,6 +95,16 @@ def gcs_factory(docker_gcs):
     return factory
 
 
+@pytest.fixture
+def offline_gcs_factory():
+    """Anonymous filesystems for tests which stub out all requests"""
+
+    def factory(**kwargs):
+        return GCSFileSystem(token="anon", skip_instance_cache=True, **kwargs)
+
+    return factory
+
+
 @pytest.fixture
 def gcs(gcs_factory, populate=True):
     gcs = gcs_factory()
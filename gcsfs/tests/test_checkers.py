@@ -6,13 +6,23 @@ import pytest
 from gcsfs.checkers import Crc32cChecker, MD5Checker, SizeChecker, crcmod
 from gcsfs.retry import ChecksumError
 
+try:
+    import google_crc32c
+except ImportError:
+    google_crc32c = None
+
+has_crc32c = google_crc32c is not None or crcmod is not None
+
 
 def google_response_from_data(expected_data: bytes, actual_data=None):
 
     actual_data = actual_data or expected_data
     checksum = md5(actual_data)
     checksum_b64 = base64.b64encode(checksum.digest()).decode("UTF-8")
-    if crcmod is not None:
+    if google_crc32c is not None:
+        checksum = google_crc32c.Checksum(actual_data)
+        crc = base64.b64encode(checksum.digest()).decode()
+    elif crcmod is not None:
         checksum = crcmod.Crc(0x11EDC6F41, initCrc=0, xorOut=0xFFFFFFFF)
         checksum.update(actual_data)
         crc = base64.b64encode(checksum.digest()).decode()
@@ -20,7 +30,7 @@ def google_response_from_data(expected_data: bytes, actual_data=None):
     class response:
         content_length = len(actual_data)
         headers = {"X-Goog-Hash": f"md5={checksum_b64}"}
-        if crcmod is not None:
+        if has_crc32c:
             headers["X-Goog-Hash"] += f",crc32c={crc}"
 
     return response
@@ -54,7 +64,7 @@ params = [
     (MD5Checker(), b"hello world", b"hello world", ()),
 ]
 
-if crcmod is not None:
+if has_crc32c:
     params.append(
         (Crc32cChecker(), b"hello world", b"different checksum", (ChecksumError,))
     )
@@ -80,7 +90,7 @@ params = [
     (SizeChecker(), b"hello world", b"different size", (AssertionError,)),
 ]
 
-if crcmod is not None:
+if has_crc32c:
     params.append((Crc32cChecker(), b"hello world", b"hello world", ()))
     params.append(
         (Crc32cChecker(), b"hello world", b"different size", (ChecksumError,))
@@ -104,7 +114,7 @@ params = [
     (SizeChecker(), b"hello world", b"hello world", ()),
     (SizeChecker(), b"hello world", b"different size", (AssertionError,)),
 ]
-if crcmod is not None:
+if has_crc32c:
     params.extend(
         [
             (Crc32cChecker(), b"hello world", b"different checksum", (ChecksumError,)),
@@ -122,3 +132,18 @@ def test_checker_validate_json_response(checker, data, actual_data, raises):
             checker.validate_json_response(response)
     else:
         checker.validate_json_response(response)
+
+
+@pytest.mark.parametrize(
+    "checker",
+    [MD5Checker, SizeChecker] + ([Crc32cChecker] if has_crc32c else []),
+)
+def test_checker_update_memoryview(checker):
+    data = b"hello world\n"
+    expected, actual = checker(), checker()
+    expected.update(data)
+    actual.update(memoryview(data)[:5])
+    actual.update(memoryview(data)[5:])
+    response = google_response_from_data(data)
+    expected.validate_http_response(response)
+    actual.validate_http_response(response)
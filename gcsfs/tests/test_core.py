@@ -444,7 +444,9 @@ def test_cat_file(gcs):
 
 @pytest.mark.parametrize("consistency", [None, "size", "md5", "crc32c"])
 def test_get_put(consistency, gcs):
-    if consistency == "crc32c" and gcsfs.checkers.crcmod is None:
+    if consistency == "crc32c" and not (
+        gcsfs.checkers.google_crc32c or gcsfs.checkers.crcmod
+    ):
         pytest.skip("No CRC")
     if consistency == "size" and not gcs.on_google:
         pytest.skip("emulator does not return size")
@@ -1528,3 +1530,431 @@ def test_sign(gcs, monkeypatch):
 
     response = requests.get(result)
     assert response.text == "This is a test string"
+
+
+def test_process_objects_batch_matches_process_object(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    items = [
+        {
+            "kind": "storage#object",
+            "name": "nested/file1",
+            "size": "6",
+            "updated": "2024-01-02T03:04:05.678Z",
+            "timeCreated": "2024-01-02T03:04:05.6Z",
+            "generation": "1704164645678000",
+            "metageneration": "1",
+        },
+        {"kind": "storage#object", "name": "file2"},
+        {"kind": "storage#object", "name": "file3", "metageneration": "2"},
+    ]
+    expected = [gcs._process_object(TEST_BUCKET, dict(i)) for i in items]
+    assert gcs._process_objects_batch(TEST_BUCKET, items) == expected
+
+
+@pytest.mark.parametrize(
+    "s",
+    [
+        "",
+        "abc-_.~XYZ019",
+        "nested/file1",
+        "a b#c?d=e&f%g",
+        "%2F/%25",
+        "ünïcødé/ファイル",
+    ],
+)
+def test_quote_matches_urllib(s):
+    from urllib.parse import quote as quote_urllib
+
+    assert quote(s) == quote_urllib(s, safe="")
+    assert quote(s.encode()) == quote_urllib(s.encode(), safe="")
+
+
+@pytest.mark.parametrize("s", [5, None, ["a"]])
+def test_quote_rejects_non_string(s):
+    with pytest.raises(TypeError):
+        quote(s)
+
+
+def test_requests_timeout_updates(offline_gcs_factory):
+    gcs = offline_gcs_factory(requests_timeout=5)
+    assert gcs._requests_timeout.total == gcs.requests_timeout == 5
+    gcs.requests_timeout = 10
+    assert gcs._requests_timeout.total == gcs.requests_timeout == 10
+
+
+def test_get_headers_cached(offline_gcs_factory):
+    from google.oauth2.credentials import Credentials
+
+    gcs = offline_gcs_factory()
+    base = gcs._get_headers(None)
+    assert base == {"User-Agent": "python-gcsfs/" + version}
+    assert gcs._get_headers(None) is base
+
+    gcs.credentials.credentials = Credentials("token1")
+    base = gcs._get_headers(None)
+    assert base["authorization"] == "Bearer token1"
+    assert gcs._get_headers({}) is base
+
+    out = gcs._get_headers({"Range": "bytes=0-1", "authorization": "other"})
+    assert out["Range"] == "bytes=0-1"
+    assert out["authorization"] == "Bearer token1"
+    assert "Range" not in gcs._get_headers(None)
+
+    gcs.credentials.credentials.token = "token2"
+    assert gcs._get_headers(None)["authorization"] == "Bearer token2"
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("gs://bucket/key", "bucket/key"),
+        ("gcs://bucket/key", "bucket/key"),
+        ("gs::bucket/key", "bucket/key"),
+        ("gcs::bucket/key", "bucket/key"),
+        ("bucket/key", "bucket/key"),
+        ("gs://", ""),
+        ("s3://bucket/key", "s3://bucket/key"),
+    ],
+)
+def test_strip_protocol(path, expected):
+    assert GCSFileSystem._strip_protocol(path) == expected
+    assert GCSFileSystem._strip_protocol([path, path]) == [expected, expected]
+
+
+def test_ls_from_cache_index(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    listing = [
+        {"name": "bucket/dir", "type": "directory", "size": 0},
+        {"name": "bucket/file", "type": "file", "size": 1, "generation": "1"},
+        {"name": "bucket/file", "type": "file", "size": 2, "generation": "2"},
+    ]
+    gcs.dircache["bucket"] = listing
+    gcs.dircache["bucket/dir"] = []
+    assert gcs._ls_from_cache("bucket") is listing
+    assert gcs._ls_from_cache("bucket/dir") == []
+    assert gcs._ls_from_cache("bucket/file") == listing[1:]
+    assert gcs._ls_from_cache("other/file") is None
+    with pytest.raises(FileNotFoundError):
+        gcs._ls_from_cache("bucket/missing")
+
+    # a replaced listing is re-indexed
+    gcs.dircache["bucket"] = listing[:2]
+    assert gcs._ls_from_cache("bucket/file") == listing[1:2]
+
+    gcs.invalidate_cache("bucket/file")
+    assert gcs._ls_from_cache("bucket/file") is None
+
+
+def test_info_from_cached_parent(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    listing = [
+        {"name": "bucket/dir", "type": "directory", "size": 0},
+        {"name": "bucket/file", "type": "file", "size": 1, "generation": "1"},
+        {"name": "bucket/file", "type": "file", "size": 2, "generation": "2"},
+    ]
+    gcs.dircache["bucket"] = listing
+    assert gcs.info("bucket/dir") is listing[0]
+    assert gcs.info("bucket/file") is listing[1]
+    assert gcs.info("bucket/file", generation="2") is listing[2]
+
+
+def test_info_skips_index_for_uncached_parent(monkeypatch, offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    gcs.dircache["bucket"] = [{"name": "bucket/dir", "type": "directory", "size": 0}]
+
+    async def _call(*args, **kwargs):
+        raise FileNotFoundError
+
+    monkeypatch.setattr(gcs, "_call", _call)
+    with pytest.raises(FileNotFoundError):
+        gcs.info("bucket/dir/file")
+    assert "bucket/dir" not in gcs.dircache._indices
+
+
+def test_file_read_block_size_default(monkeypatch, offline_gcs_factory):
+    from gcsfs.core import GCSFile
+
+    gcs = offline_gcs_factory()
+    monkeypatch.setattr(gcs, "info", lambda *_, **__: {"size": 0})
+    with GCSFile(gcs, "bucket/file") as f, gcs.open("bucket/file", "rb") as g:
+        assert f.blocksize == g.blocksize == gcs.default_read_block_size
+
+
+def test_fetch_range_read_ahead(monkeypatch, offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    data = bytes(range(256)) * 2**11
+    calls = []
+
+    def cat_file(path, start=None, end=None):
+        calls.append((start, end))
+        return data[start:end]
+
+    monkeypatch.setattr(gcs, "cat_file", cat_file)
+    monkeypatch.setattr(gcs, "info", lambda *_, **__: {"size": len(data)})
+    with gcs.open("bucket/file", "rb", cache_type="none") as f:
+        assert f._fetch_range(10, 20) == data[10:20]
+        assert f._fetch_range(1000, 5000) == data[1000:5000]
+        assert calls == [(10, 10 + gcsfs.core.MIN_READ_AHEAD_SIZE)]
+        assert f._fetch_range(len(data) - 10, len(data)) == data[-10:]
+        assert f._fetch_range(len(data) - 5, len(data)) == data[-5:]
+        assert len(calls) == 2
+        assert f._fetch_range(0, len(data)) == data
+        assert len(calls) == 3
+
+
+def test_upload_chunk_resends_shortfall(offline_gcs_factory):
+    import asyncio
+
+    from gcsfs.core import upload_chunk
+
+    gcs = offline_gcs_factory()
+    sent = []
+
+    async def _call(method, path, headers=None, data=None):
+        sent.append((headers["Content-Range"], data.read()))
+        if len(sent) == 1:
+            # server persisted only the first four bytes of this chunk
+            return {"Range": "bytes=0-13"}, b""
+        return {}, b'{"name": "file"}'
+
+    gcs._call = _call
+    out = asyncio.run(upload_chunk(gcs, "loc", b"0123456789", 10, 20, "text/plain"))
+    assert out == {"name": "file"}
+    assert sent == [("bytes 10-19/20", b"0123456789"), ("bytes 14-19/20", b"456789")]
+
+
+def test_upload_chunk_stalled_range(offline_gcs_factory):
+    import asyncio
+
+    from gcsfs.core import upload_chunk
+
+    gcs = offline_gcs_factory()
+    sent = []
+
+    async def _call(method, path, headers=None, data=None):
+        sent.append(headers["Content-Range"])
+        return {"Range": "bytes=0-13"}, b""
+
+    gcs._call = _call
+    with pytest.raises(OSError, match="stalled"):
+        asyncio.run(upload_chunk(gcs, "loc", b"0123456789", 10, 20, "text/plain"))
+    assert sent == ["bytes 10-19/20", "bytes 14-19/20"]
+
+
+def test_open_reuses_cached_details(monkeypatch, offline_gcs_factory):
+    gcs = offline_gcs_factory(details_cache_timeout=60)
+    calls = []
+
+    def info(path, generation=None):
+        calls.append((path, generation))
+        return {"name": path, "size": 0, "type": "file"}
+
+    monkeypatch.setattr(gcs, "info", info)
+    for _ in range(2):
+        gcs.open("bucket/dir/file", "rb").close()
+    assert calls == [("bucket/dir/file", None)]
+    gcs.open("bucket/dir/file#1", "rb").close()
+    assert len(calls) == 2
+    gcs.invalidate_cache("bucket/dir")
+    gcs.open("bucket/dir/file", "rb").close()
+    assert len(calls) == 3
+
+    async def _call(*args, **kwargs):
+        return {}
+
+    monkeypatch.setattr(gcs, "_call", _call)
+    gcs.merge("bucket/dir/file", ["bucket/dir/a", "bucket/dir/b"])
+    gcs.open("bucket/dir/file", "rb").close()
+    assert len(calls) == 4
+    gcs.setxattrs("bucket/dir/file", foo="bar")
+    gcs.open("bucket/dir/file", "rb").close()
+    assert len(calls) == 5
+    monkeypatch.setattr(gcs, "details_cache_timeout", 0)
+    gcs.open("bucket/dir/file", "rb").close()
+    assert len(calls) == 6
+
+
+def test_update_checker_threads_only_large_hashes():
+    import asyncio
+    import hashlib
+
+    from gcsfs.checkers import ConsistencyChecker, MD5Checker
+    from gcsfs.core import THREADED_HASH_MIN_SIZE, _update_checker
+
+    async def run(checker, data):
+        hashing = _update_checker(checker, data)
+        threaded = hashing is not None
+        if threaded:
+            await hashing
+        return threaded
+
+    big = b"0" * THREADED_HASH_MIN_SIZE
+    assert not asyncio.run(run(ConsistencyChecker(), big))
+    assert not asyncio.run(run(MD5Checker(), b"0"))
+    checker = MD5Checker()
+    assert asyncio.run(run(checker, big))
+    assert checker.md.hexdigest() == hashlib.md5(big).hexdigest()
+
+
+def test_ls_from_cache_max_paths(offline_gcs_factory):
+    gcs = offline_gcs_factory(max_paths=2)
+    for i in range(4):
+        gcs.dircache[f"bucket{i}"] = [{"name": f"bucket{i}/file", "type": "file"}]
+        assert gcs._ls_from_cache(f"bucket{i}/file")
+    assert list(gcs.dircache) == ["bucket2", "bucket3"]
+    assert len(gcs.dircache._indices) == 2
+    assert "bucket2" in gcs.dircache
+    gcs.dircache["bucket4"] = []
+    assert list(gcs.dircache) == ["bucket2", "bucket4"]
+
+
+def test_ls_from_cache_expired_index(offline_gcs_factory):
+    gcs = offline_gcs_factory(cache_timeout=60)
+    for i in range(10):
+        gcs.dircache[f"bucket{i}"] = [{"name": f"bucket{i}/file", "type": "file"}]
+        assert gcs._ls_from_cache(f"bucket{i}/file")
+    assert len(gcs.dircache._indices) == 10
+    for path in gcs.dircache._times:
+        gcs.dircache._times[path] -= 61  # as if set a minute ago
+    assert list(gcs.dircache) == []
+    assert gcs.dircache._indices == {}
+
+
+def test_concurrent_list_objects_bounded(offline_gcs_factory):
+    import asyncio
+
+    gcs = offline_gcs_factory(batch_size=2)
+    running = peak = 0
+
+    async def helper(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [kwargs["start_offset"]], []
+
+    items = [{"name": f"{i:03d}"} for i in range(10)]
+    with mock.patch.object(gcs, "_sequential_list_objects_helper", helper):
+        out, _ = sync(
+            gcs.loop,
+            gcs._concurrent_list_objects_helper,
+            items=items,
+            bucket=TEST_BUCKET,
+            delimiter="",
+            prefix=None,
+            versions=False,
+            page_size=2,
+        )
+    assert peak == 2
+    assert out == [None, "001", "002", "003", "004", "005"]
+
+
+def test_list_objects_parallel_shards(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    calls = []
+
+    async def helper(**kwargs):
+        calls.append((kwargs["start_offset"], kwargs["end_offset"]))
+        return [kwargs["start_offset"]], ["dir/sub/"]
+
+    with mock.patch.object(gcs, "_sequential_list_objects_helper", helper):
+        items, prefixes = sync(
+            gcs.loop, gcs._do_list_objects, f"{TEST_BUCKET}/dir", parallel_shards=4
+        )
+    splits = [s for s, _ in calls[1:]]
+    assert splits == sorted(splits) and all(s.startswith("dir/") for s in splits)
+    assert calls == list(zip([None, *splits], [*splits, None]))
+    assert items == [None, *splits]
+    assert prefixes == ["dir/sub/"]
+
+
+def test_shard_offsets_distinct():
+    from gcsfs.core import _shard_offsets
+
+    splits = _shard_offsets("dir/", 200)
+    assert len(splits) == len(set(splits)) == 94
+
+
+def test_find_parallel_shards(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    calls = []
+
+    async def do_list_objects(path, parallel_shards=None, **kwargs):
+        calls.append(parallel_shards)
+        return [{"name": f"{TEST_BUCKET}/dir/a", "type": "file", "size": 1}], []
+
+    with mock.patch.object(gcs, "_do_list_objects", do_list_objects):
+        assert gcs.find(f"{TEST_BUCKET}/dir", parallel_shards=4) == [
+            f"{TEST_BUCKET}/dir/a"
+        ]
+    assert calls == [4]
+
+
+@pytest.mark.parametrize(
+    "path, version_aware, expected",
+    [
+        ("gs://bucket", True, ("bucket", "", None)),
+        ("bucket/key", True, ("bucket", "key", None)),
+        ("/bucket/dir/key", True, ("bucket", "dir/key", None)),
+        ("bucket/key#123", True, ("bucket", "key", "123")),
+        ("bucket/key?generation=123", True, ("bucket", "key", "123")),
+        ("bucket/key?generation=123#456", True, ("bucket", "key", "456")),
+        ("bucket/key?other=1", True, ("bucket", "key?other=1", None)),
+        ("bucket/key#abc", True, ("bucket", "key#abc", None)),
+        ("bucket/dir:key#123", True, ("bucket", "dir:key", "123")),
+        ("bucket/key#+123", True, ("bucket", "key#+123", None)),
+        ("bucket/key#²", True, ("bucket", "key#²", None)),
+        ("bucket//key?generation=123", True, ("bucket", "/key", "123")),
+        ("bucket/key#123", False, ("bucket", "key#123", None)),
+    ],
+)
+def test_split_path(path, version_aware, expected):
+    assert GCSFileSystem._split_path(path, version_aware=version_aware) == expected
+
+
+def test_get_params(offline_gcs_factory):
+    gcs = offline_gcs_factory()
+    kwargs = {"prefix": "a", "maxResults": 1}
+    assert gcs._get_params(kwargs) == kwargs
+    assert gcs._get_params({"prefix": "a", "pageToken": None}) == {"prefix": "a"}
+    gcs.requester_pays = "my-project"
+    assert gcs._get_params(kwargs) == {**kwargs, "userProject": "my-project"}
+    assert kwargs == {"prefix": "a", "maxResults": 1}
+
+
+def test_coalesce_generation():
+    from gcsfs.core import _coalesce_generation
+
+    assert _coalesce_generation() is None
+    assert _coalesce_generation(None, None) is None
+    assert _coalesce_generation("1", None) == "1"
+    assert _coalesce_generation(None, "1", "1") == "1"
+    with pytest.raises(ValueError, match="more than one"):
+        _coalesce_generation("1", None, "2")
+
+
+def test_token_needs_refresh(offline_gcs_factory):
+    from google.oauth2.credentials import Credentials
+
+    gcs = offline_gcs_factory()
+    expired = Credentials("token", expiry=datetime(2000, 1, 1))
+    assert gcs._token_needs_refresh(expired)
+    # validity is checked at most once per second
+    assert not gcs._token_needs_refresh(expired)
+    gcs._token_checked = 0
+    assert not gcs._token_needs_refresh(Credentials("token"))
+
+
+def test_batch_response_parsing():
+    from gcsfs.core import _batch_response_code, _batch_response_error
+
+    part = (
+        b"\r\nContent-Type: application/http\r\n\r\nHTTP/1.1 404 Not Found\r\n"
+        b'Content-Type: application/json\r\n\r\n{\n "error": {\n  "code": 404\n }\n}\r\n'
+    )
+    assert _batch_response_code(part) == 404
+    assert _batch_response_error(part) == '{  "code": 404 }'
+    assert _batch_response_code(b"HTTP/1.1 204 No Content\r\n") == 204
+    assert _batch_response_code(b"garbage") is None
+    assert _batch_response_error(b"HTTP/1.1 500 {}") is None
@@ -31,7 +31,11 @@ setup(
     long_description=(
         open("README.rst").read() if os.path.exists("README.rst") else ""
     ),
-    extras_require={"gcsfuse": ["fusepy"], "crc": ["crcmod"]},
+    extras_require={
+        "gcsfuse": ["fusepy"],
+        "crc": ["google-crc32c"],
+        "orjson": ["orjson"],
+    },
     python_requires=">=3.8",
     zip_safe=False,
 )